@@ -9,16 +9,26 @@ Run via PM2 with cron_restart for periodic execution:
 Or manually:
     uv run python3 scrape_scheduled.py
 """
-import json
-import os
+import asyncio
+import gzip
+import hashlib
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+import orjson
+
+ROOT = Path(__file__).resolve().parent
+DATA_DIR = ROOT / "data"
+CACHE_DIR = DATA_DIR / "cache"
+
+sys.path.insert(0, str(ROOT / "src"))
 
 from scraper.threads_scraper import ThreadsScraper
 from scraper.parser import ThreadsParser
+from scraper.utils.throttle import gather_throttled
 
 # Monitored accounts (mirrors threads-monitor.ts)
 MONITORED_ACCOUNTS = {
@@ -32,19 +42,41 @@ MONITORED_ACCOUNTS = {
     "news": ["nytimes", "washingtonpost", "reuters", "apnews"],
 }
 
-CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "cache")
 LIMIT_PER_ACCOUNT = 10
+MAX_BACKUPS = 10
+MAX_CONCURRENCY = 4  # Concurrent profile fetches against threads.net
+RATE_LIMIT_DELAY = 2  # Seconds each worker slot waits before taking the next account
+
+
+async def _fetch_all(scraper, all_accounts):
+    # Fetches are blocking requests calls run in threads; size the pool to
+    # the concurrency limit rather than asyncio's CPU-based default
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="scrape")
+    )
+    tasks = [
+        partial(scraper.fetch_user_threads_async, username=username, limit=LIMIT_PER_ACCOUNT)
+        for _, username in all_accounts
+    ]
+    return await gather_throttled(tasks, MAX_CONCURRENCY, RATE_LIMIT_DELAY, return_exceptions=True)
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file so readers never see a partial file."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
 
 
 def scrape_all():
-    os.makedirs(CACHE_DIR, exist_ok=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
     settings = {
         "timeout": 15,
         "use_offline": False,
         "use_proxies": False,
     }
-    scraper = ThreadsScraper(settings=settings)
+    scraper = ThreadsScraper(settings=settings, data_dir=DATA_DIR)
     parser = ThreadsParser()
 
     all_posts = []
@@ -57,11 +89,18 @@ def scrape_all():
 
     print(f"[{datetime.now(timezone.utc).isoformat()}] Starting scheduled scrape of {len(all_accounts)} accounts", flush=True)
 
-    for category, username in all_accounts:
+    results = asyncio.run(_fetch_all(scraper, all_accounts))
+
+    # Dedup in account order once all fetches have completed
+    for (category, username), raw_items in zip(all_accounts, results):
         try:
-            raw_items = scraper.fetch_user_threads(username=username, limit=LIMIT_PER_ACCOUNT)
-            parsed = [parser.parse_item(item, default_username=username) for item in raw_items]
-            valid = [p for p in parsed if p and p.get("id")]
+            if isinstance(raw_items, BaseException):
+                raise raw_items
+            valid = [
+                p
+                for item in raw_items
+                if (p := parser.parse_item(item, default_username=username)) and p.get("id")
+            ]
 
             for post in valid:
                 if post["id"] not in seen_ids:
@@ -70,37 +109,41 @@ def scrape_all():
                     all_posts.append(post)
 
             print(f"  @{username}: {len(valid)} posts", flush=True)
-            time.sleep(2)  # Rate limit between accounts
 
         except Exception as e:
             print(f"  @{username}: ERROR - {e}", file=sys.stderr, flush=True)
 
     # Write cache file
+    now = datetime.now(timezone.utc)
     cache_data = {
-        "scraped_at": datetime.now(timezone.utc).isoformat(),
+        "scraped_at": now.isoformat(),
         "total_posts": len(all_posts),
         "posts": all_posts,
     }
 
-    cache_path = os.path.join(CACHE_DIR, "latest.json")
-    with open(cache_path, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, ensure_ascii=False, indent=2)
+    payload = orjson.dumps(cache_data)
 
-    # Also write a timestamped backup (keep last 10)
-    ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    backup_path = os.path.join(CACHE_DIR, f"scrape_{ts}.json")
-    with open(backup_path, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, ensure_ascii=False, indent=2)
+    cache_path = CACHE_DIR / "latest.json"
+    _write_atomic(cache_path, payload)
 
-    # Cleanup old backups (keep last 10)
+    # Also write a compressed timestamped backup, skipped when the posts are
+    # unchanged since the last backup (the digest is part of the filename)
     backups = sorted(
-        [f for f in os.listdir(CACHE_DIR) if f.startswith("scrape_") and f.endswith(".json")],
+        [f.name for f in CACHE_DIR.glob("scrape_*") if f.name.endswith((".json", ".json.gz"))],
         reverse=True,
     )
-    for old in backups[10:]:
-        os.remove(os.path.join(CACHE_DIR, old))
+    digest = hashlib.blake2b(orjson.dumps(all_posts), digest_size=16).hexdigest()
+    if not (backups and backups[0].endswith(f"_{digest}.json.gz")):
+        ts = now.strftime("%Y%m%d_%H%M%S")
+        backup_name = f"scrape_{ts}_{digest}.json.gz"
+        _write_atomic(CACHE_DIR / backup_name, gzip.compress(payload))
+        backups.insert(0, backup_name)
+
+    # Cleanup old backups (keep last 10)
+    for old in backups[MAX_BACKUPS:]:
+        (CACHE_DIR / old).unlink()
 
-    print(f"[{datetime.now(timezone.utc).isoformat()}] Done. {len(all_posts)} posts cached to {cache_path}", flush=True)
+    print(f"[{now.isoformat()}] Done. {len(all_posts)} posts cached to {cache_path}", flush=True)
 
 
 if __name__ == "__main__":
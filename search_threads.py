@@ -10,15 +10,34 @@ Usage:
 Output: JSON array of posts to stdout
 """
 import argparse
+import asyncio
 import json
 import sys
-import os
+from functools import partial
+from pathlib import Path
+
+import orjson
+
+ROOT = Path(__file__).resolve().parent
+DATA_DIR = ROOT / "data"
 
 # Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+sys.path.insert(0, str(ROOT / "src"))
 
 from scraper.threads_scraper import ThreadsScraper
 from scraper.parser import ThreadsParser
+from scraper.utils.throttle import gather_throttled
+
+MAX_CONCURRENCY = 4  # Concurrent queries against threads.net
+RATE_LIMIT_DELAY = 2  # Seconds each query slot waits before taking the next query
+
+
+async def _run_queries(scraper, args):
+    """Run the username query and all keyword searches concurrently, rate limited."""
+    tasks = [partial(scraper.search_threads_async, keyword=keyword, limit=args.limit) for keyword in args.keywords]
+    if args.username:
+        tasks.insert(0, partial(scraper.fetch_user_threads_async, username=args.username, limit=args.limit))
+    return await gather_throttled(tasks, MAX_CONCURRENCY, RATE_LIMIT_DELAY)
 
 
 def main():
@@ -53,41 +72,30 @@ def main():
         "use_proxies": False,
     }
 
-    scraper = ThreadsScraper(settings=settings)
+    scraper = ThreadsScraper(settings=settings, data_dir=DATA_DIR)
     threads_parser = ThreadsParser()
     all_results = []
 
     try:
-        if args.username:
-            raw_items = scraper.fetch_user_threads(
-                username=args.username, limit=args.limit
-            )
-            parsed = [
-                threads_parser.parse_item(item, default_username=args.username)
-                for item in raw_items
-            ]
-            all_results.extend([p for p in parsed if p])
+        results_per_query = asyncio.run(_run_queries(scraper, args))
 
-        for keyword in args.keywords:
-            raw_items = scraper.search_threads(keyword=keyword, limit=args.limit)
-            parsed = [
-                threads_parser.parse_item(item, default_username="")
+        # Results come back in query order: username first, then keywords
+        default_usernames = ([args.username] if args.username else []) + [""] * len(args.keywords)
+        for raw_items, default_username in zip(results_per_query, default_usernames):
+            all_results.extend(
+                p
                 for item in raw_items
-            ]
-            all_results.extend([p for p in parsed if p])
+                if (p := threads_parser.parse_item(item, default_username=default_username))
+            )
 
-        # Deduplicate by id
-        seen = set()
-        unique = []
+        # Deduplicate by id, keeping the first occurrence; items without an id
+        # are keyed by identity so they are all kept, in order
+        unique = {}
         for item in all_results:
-            item_id = item.get("id", "")
-            if item_id and item_id not in seen:
-                seen.add(item_id)
-                unique.append(item)
-            elif not item_id:
-                unique.append(item)
-
-        print(json.dumps(unique[: args.limit], ensure_ascii=False, indent=2), flush=True)
+            unique.setdefault(item.get("id") or id(item), item)
+
+        results = list(unique.values())[: args.limit]
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode(), flush=True)
 
     except Exception as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr, flush=True)
@@ -6,13 +6,20 @@ No login required for public profiles and search.
 """
 from __future__ import annotations
 
+import asyncio
+import codecs
 import json
 import re
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import orjson
 import requests
+import xxhash
+from requests.adapters import HTTPAdapter
+from diskcache import Cache
 
 from .utils.logger import get_logger
 from .utils.error_handler import retry
@@ -56,6 +63,22 @@ PAGE_HEADERS = {
 
 GRAPHQL_URL = "https://www.threads.net/api/graphql"
 
+# Keep-alive connections per session, enough for concurrent account fetches
+POOL_SIZE = 20
+
+# Patterns used against profile/search page HTML
+# User id: "pk" (embedded JSON) anywhere on the page takes priority; otherwise
+# the first "userID" (relay data) or "user_id" (cookie data) in one pass
+_RE_PK = re.compile(r'"(pk)":"(\d+)"')
+_RE_ANY_UID = re.compile(r'"(pk|userID|user_id)":"(\d+)"')
+_RE_LSD = re.compile(r'"LSD",\[\],\{"token":"([^"]+)"')
+_RE_THREAD_ITEMS = re.compile(r'"thread_items"\s*:\s*')
+
+# Disk cache expiry (seconds); the cache persists across scheduled runs
+USER_ID_TTL = 86400
+LSD_TOKEN_TTL = 3600
+USER_THREADS_TTL = 120
+
 
 class ThreadsScraper:
     """Fetch public Threads posts for given usernames or search keywords."""
@@ -65,7 +88,7 @@ class ThreadsScraper:
         settings: Optional[Dict[str, Any]] = None,
         config_dir: Optional[Path] = None,
         data_dir: Optional[Path] = None,
-    ):
+    ) -> None:
         settings = settings or {}
         self.timeout = settings.get("timeout", 15)
         self.use_offline = settings.get("use_offline", False)
@@ -74,38 +97,65 @@ class ThreadsScraper:
         # Separate sessions for API and page requests
         self.api_session = requests.Session()
         self.api_session.headers.update(API_HEADERS)
+        self.api_session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
 
         self.page_session = requests.Session()
         self.page_session.headers.update(PAGE_HEADERS)
+        self.page_session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
 
         self._lsd_token: Optional[str] = None
+        self._lsd_lock = threading.Lock()
+
+        self._cache: Optional[Cache] = None
+        self._cache_lock = threading.Lock()
+
+    @property
+    def cache(self) -> Cache:
+        """Persistent cache for user ids, LSD tokens and recent fetch results.
+
+        Opened on first use, so offline runs never create the cache directory.
+        """
+        if self._cache is None:
+            with self._cache_lock:
+                if self._cache is None:
+                    self._cache = Cache(str(self.data_dir / "diskcache"))
+        return self._cache
 
     def _get_lsd_token(self) -> str:
         """Fetch an LSD token from the Threads homepage."""
         if self._lsd_token:
             return self._lsd_token
-        try:
-            resp = self.page_session.get(
-                "https://www.threads.net/@instagram",
-                timeout=self.timeout,
-            )
-            match = re.search(r'"LSD",\[\],\{"token":"([^"]+)"', resp.text)
-            if match:
-                self._lsd_token = match.group(1)
-                logger.info(f"Obtained LSD token: {self._lsd_token[:8]}...")
+        # Concurrent queries share one token; only the first caller fetches it
+        with self._lsd_lock:
+            if self._lsd_token:
                 return self._lsd_token
-        except Exception as e:
-            logger.warning(f"Failed to get LSD token: {e}")
-        self._lsd_token = "default"
-        return self._lsd_token
+            cached = self.cache.get("lsd")
+            if cached:
+                self._lsd_token = cached
+                return self._lsd_token
+            try:
+                resp = self.page_session.get(
+                    "https://www.threads.net/@instagram",
+                    timeout=self.timeout,
+                )
+                match = _RE_LSD.search(resp.text)
+                if match:
+                    self._lsd_token = match.group(1)
+                    self.cache.set("lsd", self._lsd_token, expire=LSD_TOKEN_TTL)
+                    logger.info(f"Obtained LSD token: {self._lsd_token[:8]}...")
+                    return self._lsd_token
+            except Exception as e:
+                logger.warning(f"Failed to get LSD token: {e}")
+            self._lsd_token = "default"
+            return self._lsd_token
 
-    @retry(exceptions=(requests.RequestException, json.JSONDecodeError), tries=3, delay=1.0)
+    @retry(exceptions=(requests.RequestException, orjson.JSONDecodeError), tries=3, delay=1.0)
     def _graphql_request(self, doc_id: str, variables: Dict[str, Any]) -> Any:
         """Make a GraphQL request to the Threads API."""
         lsd = self._get_lsd_token()
         data = {
             "lsd": lsd,
-            "variables": json.dumps(variables),
+            "variables": orjson.dumps(variables).decode(),
             "doc_id": doc_id,
         }
         headers = {
@@ -120,7 +170,7 @@ class ThreadsScraper:
             timeout=self.timeout,
         )
         resp.raise_for_status()
-        return resp.json()
+        return orjson.loads(resp.content)
 
     def _fetch_profile_page(self, username: str) -> str:
         """Fetch a profile page using browser-like headers for server-side rendering."""
@@ -130,104 +180,180 @@ class ThreadsScraper:
         )
         return resp.text
 
+    def _stream_profile_page(self, username: str, limit: int) -> Tuple[str, List[Dict[str, Any]]]:
+        """Stream a profile page, extracting embedded posts as their arrays arrive.
+
+        Returns the HTML read and the deduplicated posts, the same rows
+        _extract_threads_from_html would give. The download is aborted as
+        soon as limit posts have been found.
+        """
+        resp = self.page_session.get(
+            f"https://www.threads.net/@{username}",
+            stream=True,
+            timeout=self.timeout,
+        )
+        try:
+            text_decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+            json_decoder = json.JSONDecoder()
+            html = ""
+            scan_pos = 0
+            retry_at = 0
+            seen_ids: Set[str] = set()
+            seen_texts: Set[int] = set()
+            threads: List[Dict[str, Any]] = []
+            for chunk in resp.iter_content(chunk_size=65536):
+                html += text_decoder.decode(chunk)
+
+                # Decode every thread_items array that is complete in the buffer
+                while len(threads) < limit:
+                    match = _RE_THREAD_ITEMS.search(html, scan_pos)
+                    if not match:
+                        # Keep a tail so a key split across chunks is still found
+                        scan_pos = max(scan_pos, len(html) - 32)
+                        break
+                    if match.end() >= len(html):
+                        break
+                    if not html.startswith("[", match.end()):
+                        scan_pos = match.end()
+                        continue
+                    if len(html) < retry_at:
+                        break  # Wait for more of the cut-off array before decoding again
+                    try:
+                        items, scan_pos = json_decoder.raw_decode(html, match.end())
+                        retry_at = 0
+                    except json.JSONDecodeError as e:
+                        if not self._is_truncated_json(e, len(html)):
+                            scan_pos = match.end()  # Invalid array; skip it like the extractor does
+                            retry_at = 0
+                            continue
+                        # Array not fully downloaded yet; retry once the pending part has
+                        # grown by half, so a large array is re-decoded O(log n) times
+                        retry_at = len(html) + (len(html) - match.end()) // 2
+                        break
+                    self._collect_posts(items, username, seen_ids, seen_texts, threads, limit)
+
+                if len(threads) >= limit:
+                    logger.debug(f"Stopped profile download for @{username} after {len(html)} bytes")
+                    break
+            return html + text_decoder.decode(b"", final=True), threads
+        finally:
+            resp.close()
+
+    @staticmethod
+    def _is_truncated_json(error: json.JSONDecodeError, buffer_len: int) -> bool:
+        """Whether a raw_decode error means the input was cut off rather than invalid."""
+        # An unterminated string runs to the end of the buffer; otherwise the
+        # error sits at (or, inside a true/false/null or \uXXXX escape, just
+        # before) the end of the buffer
+        return error.msg.startswith("Unterminated string") or error.pos >= buffer_len - 6
+
     def _get_user_id(self, username: str) -> Optional[str]:
         """Get the user ID from a username by scraping the profile page."""
+        cached = self.cache.get(f"uid:{username}")
+        if cached:
+            return cached
         try:
             html = self._fetch_profile_page(username)
 
-            # Pattern 1: "pk":"63458556663" in embedded JSON
-            match = re.search(r'"pk":"(\d+)"', html)
-            if match:
-                logger.info(f"Found user ID via pk for @{username}: {match.group(1)}")
-                return match.group(1)
-
-            # Pattern 2: "userID":"63458556663" in relay data
-            match = re.search(r'"userID":"(\d+)"', html)
-            if match:
-                logger.info(f"Found user ID via userID for @{username}: {match.group(1)}")
-                return match.group(1)
-
-            # Pattern 3: "user_id":"..." in cookie data
-            match = re.search(r'"user_id":"(\d+)"', html)
+            match = _RE_PK.search(html) or _RE_ANY_UID.search(html)
             if match:
-                return match.group(1)
+                logger.info(f"Found user ID via {match.group(1)} for @{username}: {match.group(2)}")
+                self.cache.set(f"uid:{username}", match.group(2), expire=USER_ID_TTL)
+                return match.group(2)
 
             logger.warning(f"No user ID found in HTML for @{username} (page size: {len(html)} bytes)")
         except Exception as e:
             logger.warning(f"Failed to get user ID for @{username}: {e}")
         return None
 
+    @staticmethod
+    def _post_to_row(post: Dict[str, Any], default_username: str) -> Dict[str, Any]:
+        """Build an output row from a raw post dict (GraphQL or embedded HTML)."""
+        user = post.get("user") or {}
+        username = user.get("username") or default_username
+        caption = post.get("caption", {})
+        text = caption.get("text", "") if isinstance(caption, dict) else str(caption or "")
+        app_info = post.get("text_post_app_info")
+
+        return {
+            "id": str(post.get("pk") or post.get("id") or ""),
+            "username": username,
+            "text": text,
+            "like_count": post.get("like_count", 0),
+            "reply_count": app_info.get("direct_reply_count", 0) if isinstance(app_info, dict) else 0,
+            "repost_count": post.get("repost_count", 0),
+            "created_at": post.get("taken_at"),
+            "url": f"https://www.threads.net/@{username}/post/{post.get('code', '')}",
+        }
+
+    @staticmethod
+    def _is_new_post(row: Dict[str, Any], seen_ids: Set[str], seen_texts: Set[int]) -> bool:
+        """Dedup by id and by a 64-bit fingerprint of the text prefix, recording new rows."""
+        tid = row["id"]
+        text = row["text"]
+        text_key = xxhash.xxh3_64_intdigest(text[:100].encode("utf-8", "ignore")) if text else 0
+        if tid and tid in seen_ids:
+            return False
+        if text_key and text_key in seen_texts:
+            return False
+        if tid:
+            seen_ids.add(tid)
+        if text_key:
+            seen_texts.add(text_key)
+        return True
+
+    def _collect_posts(
+        self,
+        items: Any,
+        username: str,
+        seen_ids: Set[str],
+        seen_texts: Set[int],
+        threads: List[Dict[str, Any]],
+        limit: int,
+    ) -> None:
+        """Append new posts from one decoded thread_items array, up to limit."""
+        if not isinstance(items, list):
+            return
+        for item in items:
+            if len(threads) >= limit:
+                return
+            post = item.get("post") if isinstance(item, dict) else None
+            if not post or not isinstance(post, dict):
+                continue
+            try:
+                row = self._post_to_row(post, username)
+            except (TypeError, AttributeError):
+                continue  # Unexpected shape, e.g. a non-dict user or caption
+            if self._is_new_post(row, seen_ids, seen_texts):
+                threads.append(row)
+
     def _extract_threads_from_html(self, html: str, username: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Extract thread posts from embedded script data in profile HTML."""
-        threads = []
+        if limit <= 0:
+            return []
 
-        # Find all "thread_items" occurrences and extract arrays using balanced brackets
-        for match in re.finditer(r'"thread_items"\s*:', html):
-            pos = match.end()
-            arr_start = html.find("[", pos)
-            if arr_start < 0 or arr_start > pos + 10:
-                continue
+        # Deduplicate as posts are extracted, and stop as soon as the limit is reached
+        seen_ids: Set[str] = set()
+        seen_texts: Set[int] = set()
+        unique: List[Dict[str, Any]] = []
 
-            # Balanced bracket matching to find the full array
-            depth = 0
-            end = -1
-            for j in range(arr_start, min(arr_start + 200000, len(html))):
-                if html[j] == "[":
-                    depth += 1
-                elif html[j] == "]":
-                    depth -= 1
-                    if depth == 0:
-                        end = j
-                        break
-            if end < 0:
+        # Find all "thread_items" occurrences and decode the array that follows;
+        # raw_decode locates the end of the array in C instead of a Python scan
+        decoder = json.JSONDecoder()
+        for match in _RE_THREAD_ITEMS.finditer(html):
+            if not html.startswith("[", match.end()):
                 continue
 
             try:
-                items = json.loads(html[arr_start:end + 1])
-
-                for item in items:
-                    post = item.get("post", {})
-                    if not post:
-                        continue
-                    user = post.get("user", {})
-                    caption = post.get("caption", {})
-                    text = caption.get("text", "") if isinstance(caption, dict) else str(caption or "")
-
-                    threads.append({
-                        "id": str(post.get("pk") or post.get("id") or ""),
-                        "username": user.get("username") or username,
-                        "text": text,
-                        "like_count": post.get("like_count", 0),
-                        "reply_count": (
-                            post.get("text_post_app_info", {}).get("direct_reply_count", 0)
-                            if isinstance(post.get("text_post_app_info"), dict)
-                            else 0
-                        ),
-                        "repost_count": post.get("repost_count", 0),
-                        "created_at": post.get("taken_at"),
-                        "url": f"https://www.threads.net/@{user.get('username', username)}/post/{post.get('code', '')}",
-                    })
-            except (json.JSONDecodeError, TypeError, KeyError):
+                items, _ = decoder.raw_decode(html, match.end())
+            except json.JSONDecodeError:
                 continue
 
-        # Deduplicate by id and by text content
-        seen_ids = set()
-        seen_texts = set()
-        unique = []
-        for t in threads:
-            tid = t["id"]
-            text_key = t["text"][:100] if t["text"] else ""
-            if tid and tid in seen_ids:
-                continue
-            if text_key and text_key in seen_texts:
-                continue
-            if tid:
-                seen_ids.add(tid)
-            if text_key:
-                seen_texts.add(text_key)
-            unique.append(t)
+            self._collect_posts(items, username, seen_ids, seen_texts, unique, limit)
+            if len(unique) >= limit:
+                return unique
 
-        return unique[:limit]
+        return unique
 
     def fetch_user_threads(
         self, username: str, limit: int = 50
@@ -235,30 +361,48 @@ class ThreadsScraper:
         """Fetch threads for a given username."""
         if self.use_offline:
             return self._load_offline_data(username)
+        if limit <= 0:
+            return []
+
+        # Short-lived cache so accidental duplicate runs don't refetch
+        cache_key = f"threads:{username}:{limit}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached threads for @{username}")
+            return cached
+
+        threads = self._fetch_user_threads(username, limit)
+        if threads:
+            self.cache.set(cache_key, threads, expire=USER_THREADS_TTL)
+        return threads
+
+    def _fetch_user_threads(
+        self, username: str, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Fetch threads for a username from the profile page or GraphQL API."""
+        # A user id cached by an earlier run lets Strategy 2 skip the HTML scan,
+        # and still reach GraphQL if the profile page cannot be fetched
+        user_id = self.cache.get(f"uid:{username}")
 
         # Strategy 1: Fetch profile page and extract embedded data directly
         # This works for most accounts with server-side rendered pages
         try:
-            html = self._fetch_profile_page(username)
+            html, threads = self._stream_profile_page(username, limit)
             page_size = len(html)
             logger.info(f"Profile page for @{username}: {page_size} bytes")
 
-            # If page is large enough (>300KB), it's likely server-rendered with data
-            if page_size > 300000:
-                threads = self._extract_threads_from_html(html, username, limit)
-                if threads:
-                    logger.info(f"Extracted {len(threads)} threads for @{username} from embedded HTML data")
-                    return threads
+            # Server-rendered pages embed thread_items; the download may have
+            # stopped early, so page size no longer indicates rendered data
+            if threads:
+                logger.info(f"Extracted {len(threads)} threads for @{username} from embedded HTML data")
+                return threads
 
-            # Try to get user_id from the HTML we already fetched
-            user_id = None
-            match = re.search(r'"pk":"(\d+)"', html)
-            if match:
-                user_id = match.group(1)
-            else:
-                match = re.search(r'"userID":"(\d+)"', html)
-                if match:
-                    user_id = match.group(1)
+            # Otherwise try to get user_id from the HTML we already fetched
+            if not user_id:
+                match = _RE_PK.search(html) or _RE_ANY_UID.search(html)
+                user_id = match.group(2) if match else None
+                if user_id:
+                    self.cache.set(f"uid:{username}", user_id, expire=USER_ID_TTL)
 
             if not user_id:
                 logger.warning(f"Could not resolve user ID for @{username} (page: {page_size} bytes)")
@@ -266,7 +410,8 @@ class ThreadsScraper:
 
         except Exception as e:
             logger.warning(f"Failed to fetch profile page for @{username}: {e}")
-            return []
+            if not user_id:
+                return []
 
         # Strategy 2: Use GraphQL API with user_id
         try:
@@ -293,25 +438,7 @@ class ThreadsScraper:
             for thread_node in raw_threads[:limit]:
                 thread_items = thread_node.get("thread_items", [])
                 for item in thread_items:
-                    post = item.get("post", {})
-                    user = post.get("user", {})
-                    caption = post.get("caption", {})
-                    text = caption.get("text", "") if isinstance(caption, dict) else str(caption or "")
-
-                    threads.append({
-                        "id": str(post.get("pk") or post.get("id") or ""),
-                        "username": user.get("username") or username,
-                        "text": text,
-                        "like_count": post.get("like_count", 0),
-                        "reply_count": (
-                            post.get("text_post_app_info", {}).get("direct_reply_count", 0)
-                            if isinstance(post.get("text_post_app_info"), dict)
-                            else 0
-                        ),
-                        "repost_count": post.get("repost_count", 0),
-                        "created_at": post.get("taken_at"),
-                        "url": f"https://www.threads.net/@{username}/post/{post.get('code', '')}",
-                    })
+                    threads.append(self._post_to_row(item.get("post", {}), username))
 
             logger.info(f"Fetched {len(threads)} threads for @{username} via GraphQL")
             return threads
@@ -320,6 +447,12 @@ class ThreadsScraper:
             logger.warning(f"GraphQL fetch failed for @{username}: {e}")
             return []
 
+    async def fetch_user_threads_async(
+        self, username: str, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Async variant of fetch_user_threads, run in a worker thread."""
+        return await asyncio.to_thread(self.fetch_user_threads, username, limit)
+
     def search_threads(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search Threads for a keyword using the search API."""
         try:
@@ -333,7 +466,7 @@ class ThreadsScraper:
                 variables=variables,
             )
 
-            threads = []
+            threads: List[Dict[str, Any]] = []
             search_results = (
                 result.get("data", {})
                 .get("searchResults", {})
@@ -345,26 +478,9 @@ class ThreadsScraper:
                 thread_items = node.get("thread_items", [])
 
                 for item in thread_items:
-                    post = item.get("post", {})
-                    user = post.get("user", {})
-                    caption = post.get("caption", {})
-                    text = caption.get("text", "") if isinstance(caption, dict) else str(caption or "")
-
-                    if text:
-                        threads.append({
-                            "id": str(post.get("pk") or post.get("id") or ""),
-                            "username": user.get("username", ""),
-                            "text": text,
-                            "like_count": post.get("like_count", 0),
-                            "reply_count": (
-                                post.get("text_post_app_info", {}).get("direct_reply_count", 0)
-                                if isinstance(post.get("text_post_app_info"), dict)
-                                else 0
-                            ),
-                            "repost_count": 0,
-                            "created_at": post.get("taken_at"),
-                            "url": f"https://www.threads.net/@{user.get('username', '')}/post/{post.get('code', '')}",
-                        })
+                    row = self._post_to_row(item.get("post", {}), "")
+                    if row["text"]:
+                        threads.append(row)
 
             if threads:
                 logger.info(f"Found {len(threads)} results for '{keyword}' via search API")
@@ -376,6 +492,10 @@ class ThreadsScraper:
         # Fallback: scrape the search page
         return self._scrape_search_page(keyword, limit)
 
+    async def search_threads_async(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Async variant of search_threads, run in a worker thread."""
+        return await asyncio.to_thread(self.search_threads, keyword, limit)
+
     def _scrape_search_page(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Scrape search results from the Threads search page."""
         try:
@@ -399,8 +519,7 @@ class ThreadsScraper:
         json_file = raw_dir / f"{username}.json"
 
         if json_file.exists():
-            with open(json_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return orjson.loads(json_file.read_bytes())
 
         logger.warning(f"No offline data for @{username}")
         return []
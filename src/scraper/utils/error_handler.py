@@ -1,8 +1,38 @@
+import random
 import time
-from typing import Callable, Tuple
-def retry(exceptions: Tuple[Exception, ...], tries: int = 3, delay: float = 0.5, backoff: float = 2.0) -> Callable:
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple, Type
+def _retry_after(exc: BaseException) -> Optional[float]:
     """
-    Simple retry decorator with exponential backoff.
+    Seconds requested by a Retry-After header on a 429/503 HTTP error, if any.
+    """
+    response = getattr(exc, "response", None)
+    if response is None or getattr(response, "status_code", None) not in (429, 503):
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+def retry(
+    exceptions: Tuple[Type[BaseException], ...],
+    tries: int = 3,
+    delay: float = 0.5,
+    backoff: float = 2.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.5,
+) -> Callable:
+    """
+    Simple retry decorator with exponential backoff and jitter, capped at max_delay.
+    A Retry-After header on a 429/503 response extends the wait (never shortens
+    it); if the server asks for longer than max_delay, the error is re-raised.
     """
     def deco(fn: Callable) -> Callable:
         def wrapped(*args, **kwargs):
@@ -14,7 +44,13 @@ def retry(exceptions: Tuple[Exception, ...], tries: int = 3, delay: float = 0.5,
                 except exceptions as e:
                     if attempt >= _tries:
                         raise
-                    time.sleep(_delay)
+                    wait = min(_delay + random.uniform(0, jitter), max_delay)
+                    retry_after = _retry_after(e)
+                    if retry_after is not None:
+                        if retry_after > max_delay:
+                            raise
+                        wait = max(retry_after, wait)
+                    time.sleep(wait)
                     _delay *= backoff
             # Should not reach here
             return fn(*args, **kwargs)
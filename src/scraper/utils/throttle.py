@@ -0,0 +1,29 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List
+async def gather_throttled(
+    factories: Iterable[Callable[[], Awaitable[Any]]],
+    max_concurrency: int,
+    delay: float,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    asyncio.gather over coroutine factories, with at most max_concurrency in flight.
+    Each factory is only called once it holds a slot, so a cancelled gather
+    leaves no never-awaited coroutines behind. Each slot waits `delay` seconds
+    before taking the next factory, as a rate limit against threads.net;
+    results keep the input order.
+    """
+    factories = list(factories)
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+    pending = len(factories)
+    async def run(factory: Callable[[], Awaitable[Any]]) -> Any:
+        nonlocal pending
+        async with semaphore:
+            pending -= 1
+            try:
+                return await factory()
+            finally:
+                # No wait once nothing is queued, so the last results aren't delayed
+                if pending > 0:
+                    await asyncio.sleep(delay)
+    return await asyncio.gather(*(run(factory) for factory in factories), return_exceptions=return_exceptions)